@@ -6,15 +6,29 @@ and periodically print the last lines from the tmux pane for monitoring.
 
 from __future__ import annotations
 
+import functools
+import os
+import shlex
+import shutil
 import subprocess
+import sys
+import tempfile
 import time
 import uuid
 from pathlib import Path
 from typing import Iterable
 
+if __package__ in (None, ""):
+    # Run as a script: put the repo root on sys.path so pane_parser always
+    # imports as agents.scripts.pane_parser, which a mypyc-compiled build
+    # (see setup.py) needs to find its runtime module.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
 try:
     from agents.scripts import pane_parser
 except ModuleNotFoundError:
+    # A different top-level "agents" package (e.g. the OpenAI Agents SDK)
+    # can shadow this repo's; fall back to the sibling module.
     import pane_parser
 
 # Edit this prompt to drive the Codex CLI. It is sent after Codex starts.
@@ -23,19 +37,230 @@ PREDEFINED_PROMPT = (
     "@agents/roles/executor.md work on the next `ready` task."
 )
 
-# How often to poll the tmux pane for output.
+# How often to poll the tmux pane for output. The interval adapts to the
+# timer state: fast while waiting for the first timer, slow while the timer is
+# advancing, and fast again as it approaches the stability threshold.
 POLL_INTERVAL_SECONDS = 1
+STARTUP_POLL_INTERVAL_SECONDS = 0.25
+ADVANCING_POLL_INTERVAL_SECONDS = 2.0
+SETTLING_POLL_INTERVAL_SECONDS = 0.5
+# How many timer-less polls use the startup interval.
+STARTUP_POLLS = 2
 # How many stable polls indicate the timer has stopped updating.
 STABLE_TIMER_POLLS = 5
 
 # Simple ANSI colors for pane output.
 ANSI_CYAN = "\033[36m"
 ANSI_RESET = "\033[0m"
+HEADER_FMT = "\n[%s] ---- tmux pane tail ----\n"
+FOOTER = ANSI_RESET + "\n"
 LOG_DIR = Path(__file__).resolve().parents[1] / "scratchpads"
 
 
+def quote_tmux_arg(arg: str) -> str:
+    """Quote an argument for a tmux command line.
+
+    Control-mode commands are newline-terminated, so arguments containing
+    newlines use tmux's double-quoted escapes instead of shell quoting.
+    """
+    if not any(char in arg for char in "\n\r\t"):
+        return shlex.quote(arg)
+    escaped = (
+        arg.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("$", "\\$")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\t", "\\t")
+    )
+    return f'"{escaped}"'
+
+
+class TmuxControl:
+    """Long-lived tmux control-mode client (`tmux -C`) owning one session.
+
+    Commands are written to the client's stdin and replies are read back from
+    the `%begin`/`%end` framed blocks on stdout, so each command costs a pipe
+    round trip instead of a fork/exec of a fresh tmux client.
+    """
+
+    def __init__(self, session_name: str) -> None:
+        # Control mode needs an attached client; `-d` would exit immediately.
+        self.process = subprocess.Popen(
+            ["tmux", "-C", "new-session", "-s", session_name],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        ok, lines = self.read_block()
+        if not ok:
+            self.close()
+            raise subprocess.CalledProcessError(
+                1, ["tmux", "-C", "new-session"], stderr="\n".join(lines)
+            )
+        # Pane output notifications are not needed and would fill the pipe.
+        self.run(["refresh-client", "-f", "no-output"], check=False)
+
+    def send(self, cmd: str) -> None:
+        assert self.process.stdin is not None
+        self.process.stdin.write(cmd + "\n")
+        self.process.stdin.flush()
+
+    def read_block(self) -> tuple[bool, list[str]]:
+        """Read the next reply block; return (succeeded, output lines)."""
+        assert self.process.stdout is not None
+        guard: str | None = None
+        lines: list[str] = []
+        for raw in self.process.stdout:
+            line = raw.rstrip("\n")
+            if guard is None:
+                # Skip asynchronous notifications between replies.
+                if line.startswith("%begin "):
+                    guard = line[len("%begin "):]
+                continue
+            if line == f"%end {guard}":
+                return True, lines
+            if line == f"%error {guard}":
+                return False, lines
+            lines.append(line)
+        raise BrokenPipeError("tmux control client exited")
+
+    def run(self, args: Iterable[str], check: bool = True) -> subprocess.CompletedProcess[str]:
+        """Run a tmux command through the control client."""
+        return self.run_many([list(args)], check=check)[0]
+
+    def run_many(
+        self, commands: list[list[str]], check: bool = True
+    ) -> list[subprocess.CompletedProcess[str]]:
+        """Send all commands before reading any reply, then collect them in order.
+
+        tmux works through the queued commands while earlier replies are being
+        read, so the round trips overlap instead of running back to back.
+        """
+        try:
+            for argv in commands:
+                self.send(" ".join(quote_tmux_arg(arg) for arg in argv))
+            replies = [self.read_block() for _ in commands]
+        except OSError as exc:
+            # The client is gone (e.g. the session was killed from outside);
+            # surface it like any other failed tmux command.
+            raise subprocess.CalledProcessError(
+                1, ["tmux", *commands[0]], output="", stderr=str(exc)
+            ) from exc
+        results: list[subprocess.CompletedProcess[str]] = []
+        for argv, (ok, lines) in zip(commands, replies):
+            output = "".join(f"{line}\n" for line in lines)
+            command = ["tmux", *argv]
+            if ok:
+                results.append(
+                    subprocess.CompletedProcess(command, 0, stdout=output, stderr="")
+                )
+            else:
+                results.append(
+                    subprocess.CompletedProcess(command, 1, stdout="", stderr=output)
+                )
+        if check:
+            # Raise only after every reply is read so the stream stays framed.
+            for result in results:
+                result.check_returncode()
+        return results
+
+    def close(self) -> None:
+        if self.process.stdin is not None and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class TmuxRunner:
+    """Persistent bash shell that runs tmux commands fed through its stdin.
+
+    Used when control mode is unavailable: bash forks the tmux clients, so
+    Python only pays for one process spawn per session. Each command's stderr
+    goes to a scratch file, read back only when the command fails, so it never
+    mixes into the captured stdout.
+    """
+
+    def __init__(self) -> None:
+        fd, self.stderr_path = tempfile.mkstemp(prefix="tmux_runner_", suffix=".err")
+        os.close(fd)
+        try:
+            self.process = subprocess.Popen(
+                ["bash"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+        except OSError:
+            Path(self.stderr_path).unlink(missing_ok=True)
+            raise
+        self.sentinel = f"__OK_{uuid.uuid4().hex}__"
+
+    def call(self, cmd: list[str]) -> tuple[int, str, str]:
+        """Run `cmd` in the shell; return its exit status, stdout and stderr."""
+        assert self.process.stdin is not None
+        assert self.process.stdout is not None
+        self.process.stdin.write(
+            f"{shlex.join(cmd)} 2>{shlex.quote(self.stderr_path)}; "
+            f"echo {self.sentinel} $?\n"
+        )
+        self.process.stdin.flush()
+        chunks: list[str] = []
+        for line in self.process.stdout:
+            marker = line.find(self.sentinel)
+            if marker < 0:
+                chunks.append(line)
+                continue
+            # Output without a trailing newline shares the sentinel's line.
+            chunks.append(line[:marker])
+            returncode = int(line[marker + len(self.sentinel):])
+            stderr = ""
+            if returncode != 0:
+                stderr = Path(self.stderr_path).read_text(encoding="utf-8")
+            return returncode, "".join(chunks), stderr
+        raise BrokenPipeError("tmux runner shell exited")
+
+    def run(self, args: Iterable[str], check: bool = True) -> subprocess.CompletedProcess[str]:
+        """Run a tmux command through the shell."""
+        command = ["tmux", *args]
+        returncode, stdout, stderr = self.call(command)
+        if returncode != 0 and check:
+            raise subprocess.CalledProcessError(
+                returncode, command, output=stdout, stderr=stderr
+            )
+        return subprocess.CompletedProcess(command, returncode, stdout=stdout, stderr=stderr)
+
+    def close(self) -> None:
+        if self.process.stdin is not None and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        self.process.wait()
+        Path(self.stderr_path).unlink(missing_ok=True)
+
+
+# Persistent clients used by run_tmux when available; with neither, each
+# command spawns its own tmux process.
+tmux_control: TmuxControl | None = None
+tmux_runner: TmuxRunner | None = None
+
+
 def run_tmux(args: Iterable[str], check: bool = True) -> subprocess.CompletedProcess[str]:
     """Execute a tmux command with sane defaults."""
+    if tmux_control is not None:
+        return tmux_control.run(args, check=check)
+    if tmux_runner is not None:
+        return tmux_runner.run(args, check=check)
     return subprocess.run(
         ["tmux", *args],
         check=check,
@@ -53,6 +278,14 @@ def send_keys(target: str, line: str) -> None:
     run_tmux(["send-keys", "-t", target, line, "C-m"])
 
 
+def send_keys_batch(target: str, lines: Iterable[str]) -> None:
+    """Send several lines, each followed by Enter, in one send-keys call."""
+    args = ["send-keys", "-t", target]
+    for line in lines:
+        args.extend([line, "C-m"])
+    run_tmux(args)
+
+
 def capture_last_lines(target: str, lines: int = 10) -> str:
     result = run_tmux(
         ["capture-pane", "-t", target, "-p", "-S", f"-{lines}"],
@@ -62,62 +295,200 @@ def capture_last_lines(target: str, lines: int = 10) -> str:
     return "\n".join(result.stdout.splitlines()[-lines:])
 
 
-def capture_pane(target: str) -> str:
-    result = run_tmux(
-        ["capture-pane", "-t", target, "-p"],
-        check=True,
-    )
+def poll_pane(target: str) -> str:
+    """Capture the visible pane for one poll.
+
+    Only the visible screen is captured; the full scrollback is written once,
+    by write_pane_log.
+    """
+    result = run_tmux(["capture-pane", "-t", target, "-p"], check=True)
     return result.stdout
 
 
+def start_control(session_name: str) -> TmuxControl | None:
+    """Create the session through a control-mode client, if tmux allows it."""
+    try:
+        return TmuxControl(session_name)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_runner() -> TmuxRunner | None:
+    """Start a shell for running tmux commands, if bash is available."""
+    try:
+        runner = TmuxRunner()
+    except OSError:
+        return None
+    try:
+        runner.call(["true"])
+    except OSError:
+        runner.close()
+        return None
+    return runner
+
+
+def close_clients() -> None:
+    """Close and forget any persistent tmux client or runner shell."""
+    global tmux_control, tmux_runner
+    if tmux_control is not None:
+        tmux_control.close()
+        tmux_control = None
+    if tmux_runner is not None:
+        tmux_runner.close()
+        tmux_runner = None
+
+
 def kill_session(session_name: str) -> None:
-    run_tmux(["kill-session", "-t", session_name], check=False)
+    try:
+        run_tmux(["kill-session", "-t", session_name], check=False)
+    except (OSError, subprocess.CalledProcessError):
+        # The persistent client may already be gone (Ctrl+C also reaches the
+        # runner shell); reap it and retry with a one-off tmux process.
+        close_clients()
+        run_tmux(["kill-session", "-t", session_name], check=False)
+    close_clients()
 
 
 def write_pane_log(target: str, session_name: str) -> Path:
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     timestamp = time.strftime("%Y%m%d_%H%M%S")
     log_path = LOG_DIR / f"{session_name}_{timestamp}.log"
-    log_path.write_text(capture_pane(target), encoding="utf-8")
+    # Stream tmux's output straight into the file rather than through a str;
+    # this bypasses the persistent client but runs once per session.
+    try:
+        with open(log_path, "wb") as handle:
+            subprocess.run(
+                ["tmux", "capture-pane", "-t", target, "-p", "-S", "-"],
+                check=True,
+                stdout=handle,
+                stderr=subprocess.PIPE,
+            )
+    except subprocess.CalledProcessError:
+        # Don't leave an empty or truncated log behind.
+        log_path.unlink(missing_ok=True)
+        raise
     return log_path
 
 
+def pane_tail(pane_output: str, count: int = 10) -> str:
+    """Return the last `count` lines without splitting the whole capture."""
+    parts = pane_output.rsplit("\n", count + 1)
+    if parts and parts[-1] == "":
+        # Match splitlines(), which yields no entry after a final newline.
+        parts.pop()
+    return "\n".join(parts[-count:])
+
+
+def next_poll_interval(
+    timer_value: str | None,
+    unknown_timer_polls: int,
+    stable_timer_polls: int,
+) -> float:
+    """Pick the sleep before the next poll from the timer state."""
+    if timer_value is None:
+        if unknown_timer_polls < STARTUP_POLLS:
+            return STARTUP_POLL_INTERVAL_SECONDS
+        return POLL_INTERVAL_SECONDS
+    if stable_timer_polls >= STABLE_TIMER_POLLS - 2:
+        return SETTLING_POLL_INTERVAL_SECONDS
+    if stable_timer_polls <= 1:
+        # The timer changed since the last poll, so work is progressing.
+        return ADVANCING_POLL_INTERVAL_SECONDS
+    return POLL_INTERVAL_SECONDS
+
+
+@functools.lru_cache(maxsize=2)
+def render_final_answer(
+    pane_output: str,
+    timer_index: int | None,
+    worked_for_index: int | None,
+) -> str:
+    """Return the final answer printed after the last timer/summary line.
+
+    The indices come from the poll's existing scan of `pane_output`, so the
+    pane is not scanned again here; repeated calls on an unchanged capture
+    are served from the cache.
+    """
+    # Split on "\n" only, as scan_pane_raw counts lines; splitlines() also
+    # breaks on characters such as \u2028 and would shift the indices.
+    lines = pane_output.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    start_index = worked_for_index if worked_for_index is not None else timer_index
+    if start_index is None:
+        return ""
+    prompt_index = pane_parser.find_prompt_line(lines, start_index)
+    include_start_line = worked_for_index is not None
+    body_lines = pane_parser.extract_body_lines(
+        lines,
+        start_index,
+        prompt_index,
+        include_start_line=include_start_line,
+    )
+    return "\n".join(body_lines)
+
+
 def main() -> None:
+    global tmux_control, tmux_runner
     session_name = f"codex_task_{uuid.uuid4().hex[:8]}"
     target = f"{session_name}:0.0"
     stable_timer_polls = 0
+    unknown_timer_polls = 0
     last_timer_value = None
     session_created = False
+    last_pane_output: str | None = None
+    scan: pane_parser.PaneScan | None = None
+    output = ""
+    last_ts_second: int | None = None
+    last_ts_str = ""
 
     print(f"Starting tmux session '{session_name}' and launching Codex...")
     try:
-        create_session(session_name)
+        tmux_control = start_control(session_name)
+        if tmux_control is None:
+            # Without tmux, let create_session raise FileNotFoundError rather
+            # than having the runner shell report exit status 127.
+            if shutil.which("tmux") is not None:
+                tmux_runner = start_runner()
+            create_session(session_name)
         session_created = True
 
         # Start Codex CLI in the pane.
         send_keys(target, "codex -s danger-full-access")
         time.sleep(1)  # Give Codex a moment to start.
 
-        # Send the predefined prompt (supports multi-line strings).
-        for line in PREDEFINED_PROMPT.splitlines():
-            if line.strip() == "":
-                send_keys(target, "")  # Preserve blank lines if present.
-            else:
-                send_keys(target, line)
-        # Ensure the prompt is submitted (extra Enter after the last line).
-        send_keys(target, "\n")
+        # Send the predefined prompt (supports multi-line strings). Blank
+        # lines are kept as empty keys, and the trailing "\n" is an extra
+        # Enter to ensure the prompt is submitted.
+        prompt_lines = [
+            "" if line.strip() == "" else line
+            for line in PREDEFINED_PROMPT.splitlines()
+        ]
+        send_keys_batch(target, [*prompt_lines, "\n"])
 
         print("Monitoring tmux pane output (last 10 lines). Press Ctrl+C to stop.")
         while True:
-            pane_output = capture_pane(target)
-            lines = pane_output.splitlines()
-            output = "\n".join(lines[-10:])
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            print(f"\n[{timestamp}] ---- tmux pane tail ----")
-            print(f"{ANSI_CYAN}{output.rstrip()}{ANSI_RESET}")
-            timer_index, timer_line = pane_parser.find_last_timer_line(lines)
-            timer_value = pane_parser.extract_timer_value(timer_line)
-            context_percent, _ = pane_parser.find_context_left(lines)
+            pane_output = poll_pane(target)
+            # Only re-parse when the pane changed; otherwise reuse last tick's
+            # tail and metrics (stable-timer detection wants repeats anyway).
+            if scan is None or pane_output != last_pane_output:
+                output = pane_tail(pane_output)
+                scan = pane_parser.scan_pane_raw(pane_output)
+                last_pane_output = pane_output
+            # Polls can be sub-second; format the timestamp once per second.
+            now = int(time.time())
+            if now != last_ts_second:
+                last_ts_second = now
+                last_ts_str = time.strftime(
+                    "%Y-%m-%d %H:%M:%S", time.localtime(now)
+                )
+            sys.stdout.write(HEADER_FMT % last_ts_str)
+            sys.stdout.write(ANSI_CYAN)
+            sys.stdout.write(output.rstrip())
+            sys.stdout.write(FOOTER)
+            sys.stdout.flush()
+            timer_value = pane_parser.extract_timer_value(scan.timer_line)
+            context_percent = scan.context_percent
             timer_display = timer_value if timer_value is not None else "unknown"
             context_display = (
                 f"{context_percent}%" if context_percent is not None else "unknown"
@@ -127,31 +498,30 @@ def main() -> None:
             )
             if timer_value is None:
                 stable_timer_polls = 0
+                unknown_timer_polls += 1
                 last_timer_value = None
             else:
+                unknown_timer_polls = 0
                 if timer_value == last_timer_value:
                     stable_timer_polls += 1
                 else:
                     last_timer_value = timer_value
                     stable_timer_polls = 1
                 if stable_timer_polls >= STABLE_TIMER_POLLS:
-                    worked_for_index = pane_parser.find_last_worked_for_line(lines)
-                    start_index = (
-                        worked_for_index if worked_for_index is not None else timer_index
-                    )
-                    prompt_index = pane_parser.find_prompt_line(lines, start_index)
-                    include_start_line = worked_for_index is not None
-                    body_lines = pane_parser.extract_body_lines(
-                        lines,
-                        start_index,
-                        prompt_index,
-                        include_start_line=include_start_line,
+                    # The timer line is in this poll's capture and the answer
+                    # follows it, so no scrollback capture is needed.
+                    final_answer = render_final_answer(
+                        pane_output,
+                        scan.timer_index,
+                        scan.worked_for_index,
                     )
-                    final_answer = "\n".join(body_lines)
                     print("\nDetected stable timer; final answer from pane:")
                     print(final_answer)
                     break
-            time.sleep(POLL_INTERVAL_SECONDS)
+            next_sleep = next_poll_interval(
+                timer_value, unknown_timer_polls, stable_timer_polls
+            )
+            time.sleep(next_sleep)
 
     except KeyboardInterrupt:
         print("\nInterrupted by user; shutting down tmux session.")
@@ -167,6 +537,7 @@ def main() -> None:
             except subprocess.CalledProcessError:
                 print("Unable to capture tmux pane for logging.")
         kill_session(session_name)
+        render_final_answer.cache_clear()
         print(f"tmux session '{session_name}' terminated.")
 
 
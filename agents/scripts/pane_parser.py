@@ -3,41 +3,80 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable
+from typing import Callable, NamedTuple, TypeVar
 
 TIMER_PATTERN = re.compile(
     r"\((?P<time>(?:\d+m )?\d+s) \u2022 esc to interrupt\)"
 )
+CONTEXT_LEFT_MARKER = "context left"
 
 
-def find_last_timer_line(lines: Iterable[str]) -> tuple[int | None, str | None]:
+class PaneScan(NamedTuple):
+    """Markers found by a single backward scan over the pane lines."""
+
+    timer_index: int | None
+    timer_line: str | None
+    worked_for_index: int | None
+    context_percent: int | None
+    context_line: str | None
+
+
+_T = TypeVar("_T")
+
+
+def find_last_timer_line(lines: list[str]) -> tuple[int | None, str | None]:
     """Return the last index and line that report the active timer."""
-    line_list = list(lines)
-    for idx in range(len(line_list) - 1, -1, -1):
-        if TIMER_PATTERN.search(line_list[idx]):
-            return idx, line_list[idx]
+    for idx in range(len(lines) - 1, -1, -1):
+        if TIMER_PATTERN.search(lines[idx]):
+            return idx, lines[idx]
     return None, None
 
 
-def find_prompt_line(lines: Iterable[str], start_index: int) -> int | None:
+def find_prompt_line(lines: list[str], start_index: int) -> int | None:
     """Find the first prompt line after a given index."""
     prompt_markers = (">", "\u203a")
-    line_list = list(lines)
-    for idx in range(start_index + 1, len(line_list)):
-        stripped = line_list[idx].lstrip()
-        if stripped.startswith(prompt_markers):
+    for idx in range(start_index + 1, len(lines)):
+        line = lines[idx]
+        # Index past spaces/tabs rather than allocating an lstrip() copy.
+        i = 0
+        length = len(line)
+        while i < length and line[i] in " \t":
+            i += 1
+        if i == length:
+            continue
+        if line[i] in prompt_markers:
+            return idx
+        if line[i].isspace() and line.lstrip().startswith(prompt_markers):
             return idx
     return None
 
 
-def find_context_left(lines: Iterable[str]) -> tuple[int | None, str | None]:
+def parse_context_left(line: str) -> int | None:
+    """Parse the percent from an "NN% context left" line without a regex."""
+    pos = line.find(CONTEXT_LEFT_MARKER)
+    while pos >= 0:
+        # Walk back over the whitespace, the "%" sign and then the digits.
+        j = pos
+        while j > 0 and line[j - 1].isspace():
+            j -= 1
+        if j < pos and j > 0 and line[j - 1] == "%":
+            end = j - 1
+            start = end
+            while start > 0 and line[start - 1].isdecimal():
+                start -= 1
+            if start < end:
+                return int(line[start:end])
+        pos = line.find(CONTEXT_LEFT_MARKER, pos + 1)
+    return None
+
+
+def find_context_left(lines: list[str]) -> tuple[int | None, str | None]:
     """Return the last reported context percent remaining."""
-    line_list = list(lines)
-    for idx in range(len(line_list) - 1, -1, -1):
-        if "context left" in line_list[idx]:
-            match = re.search(r"(\d+)%\s+context left", line_list[idx])
-            if match:
-                return int(match.group(1)), line_list[idx]
+    for idx in range(len(lines) - 1, -1, -1):
+        if CONTEXT_LEFT_MARKER in lines[idx]:
+            percent = parse_context_left(lines[idx])
+            if percent is not None:
+                return percent, lines[idx]
     return None, None
 
 
@@ -51,17 +90,16 @@ def extract_timer_value(timer_line: str | None) -> str | None:
     return None
 
 
-def find_last_worked_for_line(lines: Iterable[str]) -> int | None:
+def find_last_worked_for_line(lines: list[str]) -> int | None:
     """Return the last index containing a Worked for summary line."""
-    line_list = list(lines)
-    for idx in range(len(line_list) - 1, -1, -1):
-        if "Worked for " in line_list[idx]:
+    for idx in range(len(lines) - 1, -1, -1):
+        if "Worked for " in lines[idx]:
             return idx
     return None
 
 
 def extract_body_lines(
-    lines: Iterable[str],
+    lines: list[str],
     start_index: int | None,
     prompt_index: int | None,
     include_start_line: bool = False,
@@ -69,12 +107,96 @@ def extract_body_lines(
     """Extract the final answer body between the timer and prompt lines."""
     if start_index is None:
         return []
-    line_list = list(lines)
-    end_index = prompt_index if prompt_index is not None else len(line_list)
+    end_index = prompt_index if prompt_index is not None else len(lines)
     slice_start = start_index if include_start_line else start_index + 1
-    body_lines = list(line_list[slice_start:end_index])
+    body_lines = lines[slice_start:end_index]
     while body_lines and not body_lines[0].strip():
         body_lines.pop(0)
     while body_lines and not body_lines[-1].strip():
         body_lines.pop()
     return body_lines
+
+
+def scan_pane(lines: list[str]) -> PaneScan:
+    """Find the last timer, Worked for and context-left lines in one pass."""
+    timer_index: int | None = None
+    timer_line: str | None = None
+    worked_for_index: int | None = None
+    context_percent: int | None = None
+    context_line: str | None = None
+    for idx in range(len(lines) - 1, -1, -1):
+        line = lines[idx]
+        if (
+            timer_index is None
+            and "esc to interrupt)" in line
+            and TIMER_PATTERN.search(line)
+        ):
+            timer_index, timer_line = idx, line
+        if worked_for_index is None and "Worked for " in line:
+            worked_for_index = idx
+        if context_percent is None and CONTEXT_LEFT_MARKER in line:
+            context_percent = parse_context_left(line)
+            if context_percent is not None:
+                context_line = line
+        if (
+            timer_index is not None
+            and worked_for_index is not None
+            and context_percent is not None
+        ):
+            break
+    return PaneScan(
+        timer_index,
+        timer_line,
+        worked_for_index,
+        context_percent,
+        context_line,
+    )
+
+
+def _rfind_line(
+    text: str, marker: str, parse: Callable[[str], _T | None]
+) -> tuple[int, str, _T] | None:
+    """Find the last line containing `marker` that `parse` accepts.
+
+    Returns the line's start offset, its text and the parsed value.
+    """
+    end = len(text)
+    while True:
+        pos = text.rfind(marker, 0, end)
+        if pos < 0:
+            return None
+        start = text.rfind("\n", 0, pos) + 1
+        stop = text.find("\n", pos)
+        if stop < 0:
+            stop = len(text)
+        line = text[start:stop]
+        parsed = parse(line)
+        if parsed is not None:
+            return start, line, parsed
+        end = start
+
+
+def scan_pane_raw(pane_output: str) -> PaneScan:
+    """Like scan_pane, but search the unsplit pane text with str.rfind."""
+    timer_index: int | None = None
+    timer_line: str | None = None
+    worked_for_index: int | None = None
+    context_percent: int | None = None
+    context_line: str | None = None
+    timer = _rfind_line(pane_output, "esc to interrupt)", TIMER_PATTERN.search)
+    if timer is not None:
+        start, timer_line, _ = timer
+        timer_index = pane_output.count("\n", 0, start)
+    worked_for = _rfind_line(pane_output, "Worked for ", lambda line: line)
+    if worked_for is not None:
+        worked_for_index = pane_output.count("\n", 0, worked_for[0])
+    context = _rfind_line(pane_output, CONTEXT_LEFT_MARKER, parse_context_left)
+    if context is not None:
+        _, context_line, context_percent = context
+    return PaneScan(
+        timer_index,
+        timer_line,
+        worked_for_index,
+        context_percent,
+        context_line,
+    )
@@ -0,0 +1,204 @@
+import io
+import os
+import subprocess
+import tempfile
+import types
+import unittest
+
+from agents.scripts import dispatcher, pane_parser
+
+
+def fake_control(replies: str) -> dispatcher.TmuxControl:
+    """Build a TmuxControl whose process pipes are in-memory buffers."""
+    control = dispatcher.TmuxControl.__new__(dispatcher.TmuxControl)
+    control.process = types.SimpleNamespace(
+        stdin=io.StringIO(),
+        stdout=io.StringIO(replies),
+    )
+    return control
+
+
+class TmuxControlTests(unittest.TestCase):
+    def test_run_skips_notifications_between_blocks(self) -> None:
+        control = fake_control(
+            "%window-add @1\n"
+            "%sessions-changed\n"
+            "%begin 1 10 1\n"
+            "line one\n"
+            "\n"
+            "%end 1 10 1\n"
+        )
+
+        result = control.run(["capture-pane", "-p"])
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, "line one\n\n")
+        self.assertEqual(control.process.stdin.getvalue(), "capture-pane -p\n")
+
+    def test_error_block_sets_returncode_and_stderr(self) -> None:
+        control = fake_control(
+            "%begin 1 11 1\nparse error: unknown command: bogus\n%error 1 11 1\n"
+        )
+
+        result = control.run(["bogus"], check=False)
+
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(result.stdout, "")
+        self.assertEqual(result.stderr, "parse error: unknown command: bogus\n")
+
+    def test_check_raises_only_after_all_replies_are_read(self) -> None:
+        control = fake_control(
+            "%begin 1 12 1\nbad\n%error 1 12 1\n"
+            "%begin 1 13 1\nok\n%end 1 13 1\n"
+            "%begin 1 14 1\nnext\n%end 1 14 1\n"
+        )
+
+        with self.assertRaises(subprocess.CalledProcessError) as ctx:
+            control.run_many([["bogus"], ["display-message", "-p", "ok"]])
+
+        self.assertEqual(ctx.exception.stderr, "bad\n")
+        # The stream is still framed: the next reply belongs to the next call.
+        self.assertEqual(control.run(["display-message"]).stdout, "next\n")
+
+    def test_eof_mid_block_raises_called_process_error(self) -> None:
+        control = fake_control("%begin 1 15 1\npartial\n")
+
+        with self.assertRaises(subprocess.CalledProcessError):
+            control.run(["capture-pane", "-p"], check=False)
+
+    def test_pipelined_replies_come_back_in_order(self) -> None:
+        control = fake_control(
+            "%begin 1 16 1\nfirst\n%end 1 16 1\n"
+            "%output %1 noise\n"
+            "%begin 1 17 1\nsecond\n%end 1 17 1\n"
+        )
+
+        first, second = control.run_many([["one"], ["two"]])
+
+        self.assertEqual(first.stdout, "first\n")
+        self.assertEqual(first.args, ["tmux", "one"])
+        self.assertEqual(second.stdout, "second\n")
+        self.assertEqual(control.process.stdin.getvalue(), "one\ntwo\n")
+
+
+def fake_runner(stdout: str, stderr: str = "") -> dispatcher.TmuxRunner:
+    """Build a TmuxRunner around in-memory pipes and a scratch stderr file."""
+    runner = dispatcher.TmuxRunner.__new__(dispatcher.TmuxRunner)
+    runner.sentinel = "__OK_test__"
+    runner.process = types.SimpleNamespace(
+        stdin=io.StringIO(),
+        stdout=io.StringIO(stdout),
+    )
+    fd, runner.stderr_path = tempfile.mkstemp()
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(stderr)
+    return runner
+
+
+class TmuxRunnerTests(unittest.TestCase):
+    def make_runner(self, stdout: str, stderr: str = "") -> dispatcher.TmuxRunner:
+        runner = fake_runner(stdout, stderr)
+        self.addCleanup(os.unlink, runner.stderr_path)
+        return runner
+
+    def test_call_splits_sentinel_from_unterminated_output(self) -> None:
+        runner = self.make_runner("first\nlast__OK_test__ 0\n")
+
+        returncode, stdout, stderr = runner.call(["tmux", "list-sessions"])
+
+        self.assertEqual((returncode, stdout, stderr), (0, "first\nlast", ""))
+        self.assertIn("2>", runner.process.stdin.getvalue())
+
+    def test_call_reads_stderr_only_on_failure(self) -> None:
+        runner = self.make_runner("__OK_test__ 1\n", stderr="unknown command\n")
+
+        result = runner.run(["bogus"], check=False)
+
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(result.stdout, "")
+        self.assertEqual(result.stderr, "unknown command\n")
+        with self.assertRaises(subprocess.CalledProcessError):
+            self.make_runner("__OK_test__ 1\n").run(["bogus"])
+
+    def test_call_raises_when_shell_exits(self) -> None:
+        runner = self.make_runner("partial output\n")
+
+        with self.assertRaises(BrokenPipeError):
+            runner.call(["tmux", "list-sessions"])
+
+
+class RenderFinalAnswerTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        dispatcher.render_final_answer.cache_clear()
+
+    def test_render_final_answer_uses_newline_indices(self) -> None:
+        pane_output = "see\u2028note\nWorked for 3s\nanswer\n> prompt\n"
+        scan = pane_parser.scan_pane_raw(pane_output)
+
+        answer = dispatcher.render_final_answer(
+            pane_output, scan.timer_index, scan.worked_for_index
+        )
+
+        self.assertEqual(scan.worked_for_index, 1)
+        self.assertEqual(answer, "Worked for 3s\nanswer")
+
+
+class PaneTailTests(unittest.TestCase):
+    def test_pane_tail_matches_splitlines(self) -> None:
+        numbered = "\n".join(str(idx) for idx in range(30))
+        for pane_output in ["", "a", "a\n", "x\n\n\n", numbered, numbered + "\n"]:
+            with self.subTest(pane_output=pane_output):
+                self.assertEqual(
+                    dispatcher.pane_tail(pane_output),
+                    "\n".join(pane_output.splitlines()[-10:]),
+                )
+
+    def test_pane_tail_honours_count(self) -> None:
+        self.assertEqual(dispatcher.pane_tail("a\nb\nc\n", count=2), "b\nc")
+
+
+class NextPollIntervalTests(unittest.TestCase):
+    def test_startup_polls_are_fast_until_threshold(self) -> None:
+        self.assertEqual(
+            dispatcher.next_poll_interval(None, 0, 0),
+            dispatcher.STARTUP_POLL_INTERVAL_SECONDS,
+        )
+        self.assertEqual(
+            dispatcher.next_poll_interval(None, dispatcher.STARTUP_POLLS, 0),
+            dispatcher.POLL_INTERVAL_SECONDS,
+        )
+
+    def test_advancing_timer_polls_slowly(self) -> None:
+        self.assertEqual(
+            dispatcher.next_poll_interval("3s", 0, 1),
+            dispatcher.ADVANCING_POLL_INTERVAL_SECONDS,
+        )
+
+    def test_settling_timer_polls_quickly(self) -> None:
+        threshold = dispatcher.STABLE_TIMER_POLLS - 2
+        self.assertEqual(
+            dispatcher.next_poll_interval("3s", 0, threshold - 1),
+            dispatcher.POLL_INTERVAL_SECONDS,
+        )
+        self.assertEqual(
+            dispatcher.next_poll_interval("3s", 0, threshold),
+            dispatcher.SETTLING_POLL_INTERVAL_SECONDS,
+        )
+
+
+class QuoteTmuxArgTests(unittest.TestCase):
+    def test_plain_arguments_use_shell_quoting(self) -> None:
+        self.assertEqual(dispatcher.quote_tmux_arg("C-m"), "C-m")
+        self.assertEqual(dispatcher.quote_tmux_arg("a b;"), "'a b;'")
+        self.assertEqual(dispatcher.quote_tmux_arg(""), "''")
+
+    def test_control_characters_use_double_quoted_escapes(self) -> None:
+        self.assertEqual(dispatcher.quote_tmux_arg("\n"), '"\\n"')
+        self.assertEqual(
+            dispatcher.quote_tmux_arg('a\t"$x"\\\r\n'),
+            '"a\\t\\"\\$x\\"\\\\\\r\\n"',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
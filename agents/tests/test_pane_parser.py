@@ -40,6 +40,15 @@ class PaneParserTests(unittest.TestCase):
         self.assertEqual(percent, 100)
         self.assertEqual(line, "100% context left - ? for shortcuts")
 
+    def test_parse_context_left_matches_regex_forms(self) -> None:
+        self.assertEqual(pane_parser.parse_context_left("7%  context left"), 7)
+        self.assertEqual(
+            pane_parser.parse_context_left("no % context left, 42% context left"),
+            42,
+        )
+        self.assertIsNone(pane_parser.parse_context_left("%context left"))
+        self.assertIsNone(pane_parser.parse_context_left("context left"))
+
     def test_find_prompt_line_detects_prompt_markers(self) -> None:
         lines = [
             "Working (2s \u2022 esc to interrupt)",
@@ -52,6 +61,18 @@ class PaneParserTests(unittest.TestCase):
 
         self.assertEqual(prompt_index, 2)
 
+    def test_find_prompt_line_skips_leading_whitespace(self) -> None:
+        lines = [
+            "Worked for 3s",
+            "answer > not a prompt",
+            "",
+            " \t\u203a next",
+        ]
+
+        prompt_index = pane_parser.find_prompt_line(lines, 0)
+
+        self.assertEqual(prompt_index, 3)
+
     def test_extract_body_lines_trims_blanks(self) -> None:
         lines = [
             "header",
@@ -67,6 +88,49 @@ class PaneParserTests(unittest.TestCase):
 
         self.assertEqual(body, ["final answer line 1", "final answer line 2"])
 
+    def test_scan_pane_finds_last_markers_in_one_pass(self) -> None:
+        lines = [
+            "Working (1s \u2022 esc to interrupt)",
+            "50% context left",
+            "Worked for 3s",
+            "Listing directory contents (2s \u2022 esc to interrupt)",
+            "final answer",
+            "99% context left - ? for shortcuts",
+        ]
+
+        scan = pane_parser.scan_pane(lines)
+
+        self.assertEqual(scan.timer_index, 3)
+        self.assertEqual(scan.timer_line, lines[3])
+        self.assertEqual(scan.worked_for_index, 2)
+        self.assertEqual(scan.context_percent, 99)
+        self.assertEqual(scan.context_line, lines[5])
+
+    def test_scan_pane_reports_missing_markers(self) -> None:
+        scan = pane_parser.scan_pane(["noise", "more noise"])
+
+        self.assertEqual(scan, (None, None, None, None, None))
+
+    def test_scan_pane_raw_matches_scan_pane(self) -> None:
+        lines = [
+            "Working (1s \u2022 esc to interrupt)",
+            "Worked for 3s - 50% context left",
+            "Listing directory contents (2m 05s \u2022 esc to interrupt)",
+            "final answer",
+            "99% context left - ? for shortcuts",
+            "mentions context left and esc to interrupt) without values",
+        ]
+        pane_output = "\n".join(lines) + "\n"
+
+        self.assertEqual(
+            pane_parser.scan_pane_raw(pane_output),
+            pane_parser.scan_pane(lines),
+        )
+        self.assertEqual(
+            pane_parser.scan_pane_raw("noise\n"),
+            (None, None, None, None, None),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,22 @@
+"""
+Optional mypyc build for the tmux pane parser used by the dispatcher.
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+This drops a compiled extension next to agents/scripts/pane_parser.py, which
+Python imports in preference to the source file. Without the build, the plain
+Python module is used unchanged.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="agentic-workflow-pane-parser",
+    # agents/ has no __init__.py; explicit package bases keep the compiled
+    # module named agents.scripts.pane_parser rather than pane_parser.
+    ext_modules=mypycify(
+        ["--explicit-package-bases", "agents/scripts/pane_parser.py"]
+    ),
+)